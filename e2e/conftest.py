@@ -1,16 +1,30 @@
 from __future__ import annotations
 
-import datetime
+import codecs
+import functools
 import logging
-import random
+import os
+import selectors
 import socket
 import subprocess
 import sys
 import threading
+from io import BytesIO
 from pathlib import PurePath
-from time import sleep
+from time import monotonic, sleep
 from types import TracebackType
-from typing import IO, Callable, Generator, List, Optional, TextIO, Type, Union
+from typing import (
+    IO,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Set,
+    Type,
+    Union,
+)
 
 import pytest
 
@@ -25,103 +39,318 @@ __all__ = (
 
 here = PurePath(__file__).parent
 
+_READ_CHUNK_SIZE = 64 * 1024
+
 
 def random_port():
-    while True:
-        port = random.randint(1024, 49151)
-        with socket.socket() as s:
-            try:
-                s.bind(("127.0.0.1", port))
-                return port
-            except Exception:
-                # Let's just assume that port was in use; try again
-                continue
+    # Let the OS pick a free ephemeral port, instead of guessing and retrying.
+    with socket.socket() as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _PipeReactor:
+    """Watches pipes for every OutputStream from a single background thread.
+
+    This keeps the number of threads constant, no matter how many Shiny apps are
+    running. All selector registration changes happen on the reactor thread; other
+    threads request them via call_soon()."""
+
+    def __init__(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending: List[Callable[[], None]] = []
+        # Writing to this pipe wakes up the reactor thread from select().
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._thread = threading.Thread(
+            group=None, target=self._run, daemon=True, name="pipe-reactor"
+        )
+        self._thread.start()
+
+    def call_soon(self, func: Callable[[], None]) -> None:
+        """Run func on the reactor thread."""
+        with self._lock:
+            self._pending.append(func)
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            # The pipe is full, so the reactor is already due to wake up.
+            pass
+
+    def add_reader(self, fd: int, callback: Callable[[], None]) -> None:
+        """Call callback (on the reactor thread) whenever fd is readable."""
+        self.call_soon(
+            lambda: self._selector.register(fd, selectors.EVENT_READ, callback)
+        )
+
+    def remove_reader(self, fd: int) -> None:
+        """Stop watching fd. Must be called on the reactor thread."""
+        self._selector.unregister(fd)
+
+    def _run(self) -> None:
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                else:
+                    self._call(key.data)
+            with self._lock:
+                pending, self._pending = self._pending, []
+            for func in pending:
+                self._call(func)
+
+    @staticmethod
+    def _call(func: Callable[[], None]) -> None:
+        try:
+            func()
+        except Exception:
+            logging.exception("Error in pipe reactor callback")
+
+
+@functools.lru_cache(maxsize=None)
+def _pipe_reactor() -> _PipeReactor:
+    return _PipeReactor()
+
+
+# Selectors can't watch pipes on Windows; fall back to one reader thread per pipe.
+_use_pipe_reactor = sys.platform != "win32"
 
 
 class OutputStream:
-    """Designed to wrap an IO[str] and accumulate the output using a bg thread
+    """Designed to wrap an IO[bytes] and accumulate the output in the background
 
     Also allows for blocking waits for particular lines."""
 
-    def __init__(self, io: IO[str], desc: Optional[str] = None):
+    def __init__(self, io: IO[bytes], desc: Optional[str] = None):
         self._io = io
         self._closed = False
         self._lines: List[str] = []
-        self._cond = threading.Condition()
-        self._thread = threading.Thread(
-            group=None, target=self._run, daemon=True, name=desc
-        )
+        # For each pending wait_for_bytes() call, the undecoded output it has yet to
+        # scan, keyed by id()
+        self._raw_buffers: Dict[int, bytearray] = {}
+        self._lock = threading.Lock()
+        # One Event per pending wait_for() call; each is set whenever new lines
+        # arrive or the stream closes.
+        self._waiters: Set[threading.Event] = set()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        # Whether this stream is no longer registered with the pipe reactor
+        self._detached = True
+
+        if io.closed:
+            self._closed = True
+        elif _use_pipe_reactor:
+            self._fd = io.fileno()
+            os.set_blocking(self._fd, False)
+            self._detached = False
+            _pipe_reactor().add_reader(self._fd, self._on_readable)
+        else:
+            threading.Thread(
+                group=None, target=self._run, daemon=True, name=desc
+            ).start()
 
-        self._thread.start()
+    def close(self) -> None:
+        """Stop reading, once any output that's already buffered has been read."""
+        if _use_pipe_reactor:
+            _pipe_reactor().call_soon(self._drain_and_detach)
+        else:
+            self._io.close()
+
+    def _notify(self) -> None:
+        # Must be called with self._lock held.
+        for event in self._waiters:
+            event.set()
+
+    def _feed(self, chunk: bytes) -> None:
+        with self._lock:
+            parts = (self._partial + self._decoder.decode(chunk)).split("\n")
+            self._partial = parts.pop()
+            for buf in self._raw_buffers.values():
+                buf += chunk
+            self._lines.extend(part + "\n" for part in parts)
+            self._notify()
+
+    def _finish(self) -> None:
+        """Record any trailing partial line, then mark the stream as closed."""
+        partial = self._partial + self._decoder.decode(b"", final=True)
+        # We're finished reading self._io and need to signal any waiters that we're
+        # done and they'll never hear from us again.
+        with self._lock:
+            if partial:
+                self._lines.append(partial)
+            self._closed = True
+            self._notify()
+
+    def _on_readable(self) -> None:
+        """Read one chunk; called on the reactor thread."""
+        try:
+            chunk = os.read(self._fd, _READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""
+        if chunk:
+            self._feed(chunk)
+        else:
+            self._detach()
+
+    def _drain_and_detach(self) -> None:
+        """Read whatever output is already buffered, then stop reading, even if the
+        pipe hasn't reached EOF (e.g. a child process still has it open)."""
+        while not self._detached:
+            try:
+                chunk = os.read(self._fd, _READ_CHUNK_SIZE)
+            except OSError:
+                # Includes BlockingIOError, when nothing more is buffered
+                chunk = b""
+            if chunk:
+                self._feed(chunk)
+            else:
+                self._detach()
+
+    def _detach(self) -> None:
+        if self._detached:
+            return
+        self._detached = True
+        _pipe_reactor().remove_reader(self._fd)
+        self._io.close()
+        self._finish()
 
-    def _run(self):
-        """Pump lines into self._lines in a tight loop."""
+    def _run(self) -> None:
+        """Pump lines into self._lines, reading the pipe in large chunks."""
 
         try:
-            while not self._io.closed:
+            while True:
                 try:
-                    line = self._io.readline()
-                except ValueError:
+                    chunk = os.read(self._io.fileno(), _READ_CHUNK_SIZE)
+                except (OSError, ValueError):
                     # This is raised when the stream is closed
                     break
-                if line is None:
+                if not chunk:
                     break
-                if line != "":
-                    with self._cond:
-                        self._lines.append(line)
-                        self._cond.notify_all()
+                self._feed(chunk)
         finally:
-            # If we got here, we're finished reading self._io and need to signal any
-            # waiters that we're done and they'll never hear from us again.
-            with self._cond:
-                self._closed = True
-                self._cond.notify_all()
+            self._finish()
 
     def wait_for(self, predicate: Callable[[str], bool], timeoutSecs: float) -> bool:
-        timeoutAt = datetime.datetime.now() + datetime.timedelta(seconds=timeoutSecs)
         pos = 0
-        with self._cond:
+
+        def scan() -> bool:
+            nonlocal pos
+            with self._lock:
+                lines = self._lines[pos:]
+            pos += len(lines)
+            return any(predicate(line) for line in lines)
+
+        return self._wait(scan, timeoutSecs)
+
+    def wait_for_bytes(self, needle: bytes, timeoutSecs: float) -> bool:
+        """Like wait_for(), but searches the raw output for a byte string, rather than
+        testing each decoded line with a predicate."""
+        with self._lock:
+            # Output that arrived before this call is only kept decoded, so start from
+            # a re-encoded copy of it (plus any bytes still held by the decoder), then
+            # collect raw chunks from here on.
+            pending, _ = self._decoder.getstate()
+            buf = bytearray(("".join(self._lines) + self._partial).encode() + pending)
+            self._raw_buffers[id(buf)] = buf
+
+        def scan() -> bool:
+            with self._lock:
+                found = buf.find(needle) != -1
+                # Only keep enough bytes to catch a match spanning two chunks.
+                del buf[: max(0, len(buf) - len(needle) + 1)]
+            return found
+
+        try:
+            return self._wait(scan, timeoutSecs)
+        finally:
+            with self._lock:
+                del self._raw_buffers[id(buf)]
+
+    def _wait(self, scan: Callable[[], bool], timeoutSecs: float) -> bool:
+        """Call scan() whenever new output arrives, until it returns True (in which
+        case, return True) or the stream is closed (return False)."""
+        deadline = monotonic() + timeoutSecs
+        event = threading.Event()
+        with self._lock:
+            self._waiters.add(event)
+        try:
             while True:
-                while pos < len(self._lines):
-                    if predicate(self._lines[pos]):
-                        return True
-                    pos += 1
-                if self._closed:
+                with self._lock:
+                    closed = self._closed
+                    # Anything arriving after this point will set the event again.
+                    event.clear()
+                if scan():
+                    return True
+                if closed:
                     return False
-                else:
-                    remaining = (timeoutAt - datetime.datetime.now()).total_seconds()
-                    if remaining < 0 or not self._cond.wait(timeout=remaining):
-                        # Timed out
-                        raise TimeoutError(
-                            "Timeout while waiting for Shiny app to become ready"
-                        )
+                remaining = deadline - monotonic()
+                if remaining <= 0 or not event.wait(timeout=remaining):
+                    # Timed out
+                    raise TimeoutError(
+                        "Timeout while waiting for Shiny app to become ready"
+                    )
+        finally:
+            with self._lock:
+                self._waiters.discard(event)
 
     def __str__(self):
-        with self._cond:
+        with self._lock:
             return "".join(self._lines)
 
 
-def dummyio() -> TextIO:
-    io = TextIO()
+def dummyio() -> BinaryIO:
+    io = BytesIO()
     io.close()
     return io
 
 
 class ShinyAppProc:
-    def __init__(self, proc: subprocess.Popen[str], port: int):
+    def __init__(self, proc: subprocess.Popen[bytes], port: int):
         self.proc = proc
         self.port = port
         self.url = f"http://127.0.0.1:{port}/"
         self.stdout = OutputStream(proc.stdout or dummyio())
         self.stderr = OutputStream(proc.stderr or dummyio())
-        threading.Thread(group=None, target=self._run, daemon=True).start()
+        if not self._watch_exit():
+            threading.Thread(group=None, target=self._run, daemon=True).start()
+
+    def _watch_exit(self) -> bool:
+        """Where supported (Linux 5.3+), watch for the process exiting with a pidfd on
+        the pipe reactor, rather than with a thread blocked in proc.wait(). Returns
+        False if this isn't possible."""
+        if not _use_pipe_reactor or not hasattr(os, "pidfd_open"):
+            return False
+        try:
+            pidfd = os.pidfd_open(self.proc.pid)
+        except OSError:
+            return False
+
+        reactor = _pipe_reactor()
+
+        def on_exit() -> None:
+            reactor.remove_reader(pidfd)
+            os.close(pidfd)
+            self._on_exit()
+
+        reactor.add_reader(pidfd, on_exit)
+        return True
 
     def _run(self) -> None:
+        self._on_exit()
+
+    def _on_exit(self) -> None:
         self.proc.wait()
-        if self.proc.stdout is not None:
-            self.proc.stdout.close()
-        if self.proc.stderr is not None:
-            self.proc.stderr.close()
+        self.stdout.close()
+        self.stderr.close()
 
     def close(self) -> None:
         sleep(0.5)
@@ -139,9 +368,7 @@ class ShinyAppProc:
         self.close()
 
     def wait_until_ready(self, timeoutSecs: float) -> None:
-        if self.stderr.wait_for(
-            lambda line: "Uvicorn running on" in line, timeoutSecs=timeoutSecs
-        ):
+        if self.stderr.wait_for_bytes(b"Uvicorn running on", timeoutSecs=timeoutSecs):
             return
         else:
             raise RuntimeError("Shiny app exited without ever becoming ready")
@@ -159,14 +386,15 @@ def run_shiny_app(
     if port == 0:
         port = random_port()
 
+    # Call run_app() directly (equivalent to `shiny run --port {port} {app_file}`), to
+    # skip the CLI's argument parsing on every fixture setup.
+    code = f"from shiny._main import run_app; run_app({str(app_file)!r}, port={port})"
     child = subprocess.Popen(
-        [sys.executable, "-m", "shiny", "run", "--port", str(port), str(app_file)],
+        [sys.executable, "-c", code],
         bufsize=bufsize,
-        executable=sys.executable,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         cwd=cwd,
-        encoding="utf-8",
     )
 
     # TODO: Detect early exit
@@ -192,16 +420,19 @@ def create_app_fixture(app: Union[PurePath, str], scope: str = "module"):
     )(fixture_func)
 
 
+@functools.lru_cache(maxsize=None)
+def _example_path(example_dir: str, example_name: str) -> str:
+    return str(here / example_dir / example_name / "app.py")
+
+
 def create_example_fixture(example_name: str, scope: str = "module"):
     """Used to create app fixtures from apps in py-shiny/examples"""
-    return create_app_fixture(here / "../examples" / example_name / "app.py", scope)
+    return create_app_fixture(_example_path("../examples", example_name), scope)
 
 
 def create_doc_example_fixture(example_name: str, scope: str = "module"):
     """Used to create app fixtures from apps in py-shiny/shiny/examples"""
-    return create_app_fixture(
-        here / "../shiny/examples" / example_name / "app.py", scope
-    )
+    return create_app_fixture(_example_path("../shiny/examples", example_name), scope)
 
 
 @pytest.fixture(scope="module")
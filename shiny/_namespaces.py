@@ -1,7 +1,7 @@
 from contextlib import contextmanager
 from contextvars import ContextVar, Token
 import re
-from typing import Pattern, Union
+from typing import Callable, Match, Optional, Union
 
 
 class ResolvedId(str):
@@ -11,10 +11,7 @@ class ResolvedId(str):
 
         validate_id(id)
 
-        if self == "":
-            return ResolvedId(id)
-        else:
-            return ResolvedId(self + "-" + id)
+        return ResolvedId(f"{self}-{id}" if self else id)
 
 
 Root: ResolvedId = ResolvedId("")
@@ -33,12 +30,13 @@ def resolve_id(id: Id) -> ResolvedId:
 
 
 # \w is a large set for unicode patterns, that's fine; we mostly want to avoid some
-# special characters like space, comma, period, and especially dash
-re_valid_id: Pattern[str] = re.compile("^\\.?\\w+$")
+# special characters like space, comma, period, and especially dash. Bind the match
+# method once, since this is called for every id that gets resolved.
+_valid_id_match: Callable[[str], Optional[Match[str]]] = re.compile(r"\.?\w+\Z").match
 
 
 def validate_id(id: str):
-    if not re_valid_id.match(id):
+    if _valid_id_match(id) is None:
         raise ValueError(
             f"The string '{id}' is not a valid id; only letters, numbers, and "
             "underscore are permitted"
@@ -52,7 +50,13 @@ _current_namespace: ContextVar[ResolvedId] = ContextVar(
 
 @contextmanager
 def namespace_context(id: Union[Id, None]):
-    namespace = resolve_id(id) if id else Root
+    # Skip the lookup of the current namespace when it won't be used.
+    if not id:
+        namespace = Root
+    elif isinstance(id, ResolvedId):
+        namespace = id
+    else:
+        namespace = resolve_id(id)
     token: Token[ResolvedId] = _current_namespace.set(namespace)
     try:
         yield
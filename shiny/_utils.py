@@ -10,6 +10,7 @@ import secrets
 import socketserver
 import sys
 import tempfile
+import types
 from typing import (
     Any,
     Awaitable,
@@ -193,6 +194,9 @@ def is_async_callable(
     """
     if inspect.iscoroutinefunction(obj):
         return True
+    if isinstance(obj, types.FunctionType):
+        # A plain function's __call__ is never async; no need to inspect it.
+        return False
     if hasattr(obj, "__call__"):  # noqa: B004
         if inspect.iscoroutinefunction(obj.__call__):  # type: ignore
             return True
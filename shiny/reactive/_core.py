@@ -4,6 +4,7 @@ __all__ = ("isolate", "invalidate_later", "flush", "on_flushed", "get_current_co
 
 import asyncio
 import contextlib
+import functools
 import time
 import traceback
 import typing
@@ -36,7 +37,7 @@ class Context:
     def __init__(self) -> None:
         self.id: int = _reactive_environment.next_id()
         self._invalidated: bool = False
-        self._invalidate_callbacks: list[Callable[[], None]] = []
+        self._invalidate_callbacks: list[Callable[[], object]] = []
         self._flush_callbacks: list[Callable[[], Awaitable[None]]] = []
 
     def __call__(self) -> typing.ContextManager[None]:
@@ -56,7 +57,7 @@ class Context:
 
         self._invalidate_callbacks.clear()
 
-    def on_invalidate(self, func: Callable[[], None]) -> None:
+    def on_invalidate(self, func: Callable[[], object]) -> None:
         """Register a function to be called when this context is invalidated"""
         if self._invalidated:
             func()
@@ -93,20 +94,20 @@ class Dependents:
 
         self._dependents[ctx.id] = ctx
 
-        def on_invalidate_cb() -> None:
-            if ctx.id in self._dependents:
-                del self._dependents[ctx.id]
-
-        ctx.on_invalidate(on_invalidate_cb)
+        # When the context is invalidated, remove it from the dict it was added to. A
+        # partial of dict.pop avoids allocating a closure for every registration.
+        ctx.on_invalidate(functools.partial(self._dependents.pop, ctx.id, None))
 
     def invalidate(self) -> None:
+        if not self._dependents:
+            return
+
         # TODO: Check sort order
         # Invalidate all dependents. This gets all the dependents as list, then iterates
         # over the list. It's done this way instead of iterating over keys because it's
         # possible that a dependent is removed from the dict while iterating over it.
         # https://github.com/rstudio/py-shiny/issues/26
-        ids = sorted(self._dependents.keys())
-        for dep_ctx in [self._dependents[id] for id in ids]:
+        for dep_ctx in [self._dependents[id] for id in sorted(self._dependents)]:
             dep_ctx.invalidate()
 
 
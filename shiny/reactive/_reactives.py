@@ -2,7 +2,9 @@
 
 __all__ = ("Value", "Calc", "Calc_", "CalcAsync_", "Effect", "Effect_", "event")
 
+import datetime
 import functools
+import math
 import traceback
 import warnings
 from typing import (
@@ -31,6 +33,17 @@ if TYPE_CHECKING:
 
 T = TypeVar("T")
 
+
+# The ..session package imports this module, so its helpers can't be imported when this
+# module loads. Look them up once, on first use, instead of re-importing on every
+# Calc/Effect construction and run.
+@functools.lru_cache(maxsize=None)
+def _session_utils():
+    from ..session import _utils
+
+    return _utils
+
+
 # ==============================================================================
 # Value
 # ==============================================================================
@@ -69,6 +82,9 @@ class Value(Generic[T]):
     Effect
     """
 
+    # Sessions can hold many of these (one per input), so avoid a per-instance __dict__.
+    __slots__ = ("_value", "_read_only", "_value_dependents", "_is_set_dependents")
+
     # These overloads are necessary so that the following hold:
     # - Value() is marked by the type checker as an error, because the type T is
     #   unknown. (It is not a run-time error.)
@@ -95,9 +111,6 @@ class Value(Generic[T]):
         self._value_dependents: Dependents = Dependents()
         self._is_set_dependents: Dependents = Dependents()
 
-    def __call__(self) -> T:
-        return self.get()
-
     def get(self) -> T:
         """
         Read the reactive value.
@@ -121,6 +134,10 @@ class Value(Generic[T]):
 
         return self._value
 
+    # Reading a value (e.g. `input.x()`) is very common, so call get() directly rather
+    # than through another method call.
+    __call__ = get
+
     def set(self, value: T) -> bool:
         """
         Set the reactive value to a new value.
@@ -133,6 +150,10 @@ class Value(Generic[T]):
         Returns
         -------
         ``True`` if the value was set to a different value and ``False`` otherwise.
+        Values of simple types (numbers, strings, bytes, dates, and tuples of these) are
+        compared with ``==``; other values are compared by identity. Floats of opposite
+        sign (``0.0`` and ``-0.0``) and datetimes with different ``tzinfo`` objects are
+        never treated as equal.
 
         Raises
         ------
@@ -143,10 +164,14 @@ class Value(Generic[T]):
             raise RuntimeError(
                 "Can't set read-only Value. If you are trying to set an input value, use `update_xxx()` instead."
             )
+        if _cheap_equals(self._value, value):
+            return False
         return self._set(value)
 
     # The ._set() method allows setting read-only Value objects. This is used when the
-    # Value is part of a session.Inputs object, and the session wants to set it.
+    # Value is part of a session.Inputs object, and the session wants to set it. It only
+    # checks identity: the client only resends an unchanged input value when it's
+    # meant to re-trigger dependents (i.e. with `priority: "event"`).
     def _set(self, value: T) -> bool:
         if self._value is value:
             return False
@@ -190,6 +215,40 @@ class Value(Generic[T]):
         self._value = MISSING
 
 
+# Types whose __eq__ is cheap and well-behaved, so that setting a Value to an equal (but
+# not identical) object can be treated as a no-op. For other types (e.g. containers of
+# arbitrary objects or numpy arrays), equality may be expensive or not return a bool, so
+# only identity is checked. Floats and datetimes are handled separately in
+# _cheap_equals(), because some values that compare equal can still be told apart.
+_CHEAP_EQ_TYPES = frozenset((int, str, bytes, bool, type(None), datetime.date))
+
+
+def _cheap_equals(old: object, new: object) -> bool:
+    old_type = type(old)
+    if old_type is not type(new):
+        return False
+    if old_type in _CHEAP_EQ_TYPES:
+        return old == new
+    if old_type is float:
+        # 0.0 == -0.0, but they print differently
+        old = cast(float, old)
+        new = cast(float, new)
+        return old == new and math.copysign(1.0, old) == math.copysign(1.0, new)
+    if old_type is datetime.datetime:
+        # The same instant in two time zones compares equal, but prints differently
+        old = cast(datetime.datetime, old)
+        new = cast(datetime.datetime, new)
+        return old == new and old.tzinfo is new.tzinfo and old.fold == new.fold
+    if old_type is tuple:
+        # Date range inputs, for example, are tuples of dates.
+        old = cast("tuple[object, ...]", old)
+        new = cast("tuple[object, ...]", new)
+        return len(old) == len(new) and all(
+            _cheap_equals(x, y) for x, y in zip(old, new)
+        )
+    return False
+
+
 # ==============================================================================
 # Calc
 # ==============================================================================
@@ -218,10 +277,13 @@ class Calc_(Generic[T]):
         self.__doc__ = fn.__doc__
 
         # The CalcAsync subclass will pass in an async function, but it tells the
-        # static type checker that it's synchronous. wrap_async() is smart -- if is
-        # passed an async function, it will not change it.
-        self._fn: CalcFunctionAsync[T] = _utils.wrap_async(fn)
+        # static type checker that it's synchronous. Exactly one of _fn (async) and
+        # _sync_fn is set; sync functions are run directly, without a coroutine.
         self._is_async: bool = _utils.is_async_callable(fn)
+        self._fn: Optional[CalcFunctionAsync[T]] = (
+            cast(CalcFunctionAsync[T], fn) if self._is_async else None
+        )
+        self._sync_fn: Optional[CalcFunction[T]] = None if self._is_async else fn
 
         self._dependents: Dependents = Dependents()
         self._invalidated: bool = True
@@ -235,11 +297,9 @@ class Calc_(Generic[T]):
         # the type checker doesn't know that MISSING is the only instance of
         # MISSING_TYPE; this saves us from casting later on.
         if isinstance(session, MISSING_TYPE):
-            from ..session import get_current_session
-
             # If no session is provided, autodetect the current session (this
             # could be None if outside of a session).
-            session = get_current_session()
+            session = _session_utils().get_current_session()
         self._session = session
 
         # Use lists to hold (optional) value and error, instead of Optional[T],
@@ -251,9 +311,19 @@ class Calc_(Generic[T]):
         self._error: list[Exception] = []
 
     def __call__(self) -> T:
-        # Run the Coroutine (synchronously), and then return the value.
-        # If the Coroutine yields control, then an error will be raised.
-        return _utils.run_coro_sync(self.get_value())
+        if self._invalidated or self._running:
+            if self._sync_fn is None:
+                # Run the Coroutine (synchronously), and then return the value.
+                # If the Coroutine yields control, then an error will be raised.
+                return _utils.run_coro_sync(self.get_value())
+
+            self._dependents.register()
+            self._update_value_sync(self._sync_fn)
+        else:
+            # The cached value is up to date; return it without running anything.
+            self._dependents.register()
+
+        return self._result()
 
     # TODO: should this be private?
     async def get_value(self) -> T:
@@ -262,6 +332,9 @@ class Calc_(Generic[T]):
         if self._invalidated or self._running:
             await self.update_value()
 
+        return self._result()
+
+    def _result(self) -> T:
         if self._error:
             raise self._error[0]
 
@@ -269,36 +342,63 @@ class Calc_(Generic[T]):
 
     # TODO: should this be private?
     async def update_value(self) -> None:
-        self._ctx = Context()
-        self._most_recent_ctx_id = self._ctx.id
+        if self._sync_fn is not None:
+            self._update_value_sync(self._sync_fn)
+            return
 
-        self._ctx.on_invalidate(self._on_invalidate_cb)
-
-        self._exec_count += 1
-        self._invalidated = False
+        ctx = self._start_update()
 
         was_running = self._running
         self._running = True
 
-        from ..session import session_context
+        with _session_utils().session_context(self._session):
+            try:
+                with ctx():
+                    await self._run_func(cast(CalcFunctionAsync[T], self._fn))
+            finally:
+                self._running = was_running
 
-        with session_context(self._session):
+    def _update_value_sync(self, fn: CalcFunction[T]) -> None:
+        ctx = self._start_update()
+
+        was_running = self._running
+        self._running = True
+
+        with _session_utils().session_context(self._session):
             try:
-                with self._ctx():
-                    await self._run_func()
+                with ctx():
+                    self._run_func_sync(fn)
             finally:
                 self._running = was_running
 
+    def _start_update(self) -> Context:
+        ctx = Context()
+        self._ctx = ctx
+        self._most_recent_ctx_id = ctx.id
+
+        ctx.on_invalidate(self._on_invalidate_cb)
+
+        self._exec_count += 1
+        self._invalidated = False
+        return ctx
+
     def _on_invalidate_cb(self) -> None:
         self._invalidated = True
         self._value.clear()  # Allow old value to be GC'd
         self._dependents.invalidate()
         self._ctx = None  # Allow context to be GC'd
 
-    async def _run_func(self) -> None:
+    async def _run_func(self, fn: CalcFunctionAsync[T]) -> None:
+        self._error.clear()
+        try:
+            self._value.append(await fn())
+        except Exception as err:
+            self._error.append(err)
+
+    def _run_func_sync(self, fn: CalcFunction[T]) -> None:
         self._error.clear()
         try:
-            self._value.append(await self._fn())
+            self._value.append(fn())
         except Exception as err:
             self._error.append(err)
 
@@ -448,12 +548,17 @@ class Effect_:
         self.__name__ = fn.__name__
         self.__doc__ = fn.__doc__
 
-        # The EffectAsync subclass will pass in an async function, but it tells the
-        # static type checker that it's synchronous. wrap_async() is smart -- if is
-        # passed an async function, it will not change it.
-        self._fn: EffectFunctionAsync = _utils.wrap_async(fn)
         # This indicates whether the user's effect function (before wrapping) is async.
         self._is_async: bool = _utils.is_async_callable(fn)
+        # The EffectAsync subclass will pass in an async function, but it tells the
+        # static type checker that it's synchronous. Exactly one of _fn (async) and
+        # _sync_fn is set; sync functions are run directly, without a coroutine.
+        self._fn: Optional[EffectFunctionAsync] = (
+            cast(EffectFunctionAsync, fn) if self._is_async else None
+        )
+        self._sync_fn: Optional[EffectFunction] = (
+            None if self._is_async else cast(EffectFunction, fn)
+        )
 
         self._priority: int = priority
         self._suspended = suspended
@@ -462,6 +567,8 @@ class Effect_:
         self._invalidate_callbacks: list[Callable[[], None]] = []
         self._destroyed: bool = False
         self._ctx: Optional[Context] = None
+        # The most recently invalidated context, until it's added to the flush queue.
+        self._flush_ctx: Optional[Context] = None
         self._exec_count: int = 0
 
         self._session: Optional[Session]
@@ -469,11 +576,9 @@ class Effect_:
         # the type checker doesn't know that MISSING is the only instance of
         # MISSING_TYPE; this saves us from casting later on.
         if isinstance(session, MISSING_TYPE):
-            from ..session import get_current_session
-
             # If no session is provided, autodetect the current session (this
             # could be None if outside of a session).
-            session = get_current_session()
+            session = _session_utils().get_current_session()
         self._session = session
 
         if self._session is not None:
@@ -489,48 +594,55 @@ class Effect_:
         # TODO: More explanation here
         self._ctx = ctx
 
-        def on_invalidate_cb() -> None:
-            # Context is invalidated, so we don't need to store a reference to it
-            # anymore.
-            self._ctx = None
+        ctx.on_invalidate(self._on_invalidate_cb)
+        ctx.on_flush(self._on_flush_cb)
+
+        return ctx
 
-            for cb in self._invalidate_callbacks:
-                cb()
+    def _on_invalidate_cb(self) -> None:
+        # Context is invalidated, so we don't need to store a reference to it as the
+        # current context anymore; it's now the one that needs to be flushed.
+        self._flush_ctx = self._ctx
+        self._ctx = None
 
-            if self._destroyed:
-                return
+        for cb in self._invalidate_callbacks:
+            cb()
 
-            def _continue() -> None:
-                ctx.add_pending_flush(self._priority)
-                if self._session:
-                    self._session._send_message_sync({"busy": "busy"})
+        if self._destroyed:
+            return
 
-            if self._suspended:
-                self._on_resume = _continue
-            else:
-                _continue()
+        if self._suspended:
+            self._on_resume = self._continue
+        else:
+            self._continue()
 
-        async def on_flush_cb() -> None:
-            if not self._destroyed:
-                await self._run()
-            if self._session:
-                self._session._send_message_sync({"busy": "idle"})
+    def _continue(self) -> None:
+        ctx = self._flush_ctx
+        self._flush_ctx = None
+        if ctx is None:
+            return
 
-        ctx.on_invalidate(on_invalidate_cb)
-        ctx.on_flush(on_flush_cb)
+        ctx.add_pending_flush(self._priority)
+        if self._session:
+            self._session._send_message_sync({"busy": "busy"})
 
-        return ctx
+    async def _on_flush_cb(self) -> None:
+        if not self._destroyed:
+            await self._run()
+        if self._session:
+            self._session._send_message_sync({"busy": "idle"})
 
     async def _run(self) -> None:
         ctx = self._create_context()
         self._exec_count += 1
 
-        from ..session import session_context
-
-        with session_context(self._session):
+        with _session_utils().session_context(self._session):
             try:
                 with ctx():
-                    await self._fn()
+                    if self._sync_fn is not None:
+                        self._sync_fn()
+                    elif self._fn is not None:
+                        await self._fn()
             except SilentException:
                 # It's OK for SilentException to cause an Effect to stop running
                 pass
@@ -770,12 +882,14 @@ def event(
             )
 
         initialized = False
+        # Check which args are async once, rather than every time the event fires.
+        args_async = [is_async_callable(arg) for arg in args]
 
         async def trigger() -> None:
             vals: List[object] = []
-            for arg in args:
-                if is_async_callable(arg):
-                    v = await arg()
+            for arg, arg_is_async in zip(args, args_async):
+                if arg_is_async:
+                    v = await cast(Callable[[], Awaitable[object]], arg)()
                 else:
                     v = arg()
                 vals.append(v)
@@ -800,7 +914,7 @@ def event(
 
             return new_user_async_fn  # type: ignore
 
-        elif any([is_async_callable(arg) for arg in args]):
+        elif any(args_async):
             raise TypeError(
                 "When decorating a synchronous function with @reactive.event(), all"
                 + "arguments to @reactive.event() must be synchronous functions."
@@ -887,13 +887,14 @@ class Inputs:
 
     def __getitem__(self, key: str) -> Value[Any]:
         key = self._ns(key)
+        value = self._map.get(key)
         # Auto-populate key if accessed but not yet set. Needed to take reactive
         # dependencies on input values that haven't been received from client
         # yet.
-        if key not in self._map:
-            self._map[key] = Value[Any](read_only=True)
+        if value is None:
+            value = self._map[key] = Value[Any](read_only=True)
 
-        return self._map[key]
+        return value
 
     def __delitem__(self, key: str) -> None:
         del self._map[self._ns(key)]
@@ -1,3 +1,5 @@
+import pytest
+
 from shiny._namespaces import namespace_context, resolve_id
 
 
@@ -37,3 +39,11 @@ def test_namespaces():
 
         # Check that this still works after another context was installed/removed
         assert resolve_id("inner") == "outer-inner"
+
+
+def test_invalid_ids():
+    for id in ["", "a-b", "a b", "a.b", "a\n"]:
+        with pytest.raises(ValueError):
+            resolve_id(id)
+
+    assert resolve_id(".a_1") == ".a_1"
@@ -1,6 +1,7 @@
 """Tests for `shiny.reactive`."""
 
 import asyncio
+from datetime import date, datetime, timedelta, timezone
 from typing import List
 
 import pytest
@@ -91,6 +92,62 @@ async def test_reactive_value_same_no_invalidate():
     assert o._exec_count == 1
 
 
+@pytest.mark.asyncio
+async def test_reactive_value_equal_no_invalidate():
+    v = Value((date(2022, 1, 1), date(2022, 1, 31)))
+    s = Value("a" * 100)
+    n = Value(1000)
+
+    @Effect()
+    def o():
+        v()
+        s()
+        n()
+
+    await flush()
+    assert o._exec_count == 1
+
+    # Equal but not identical values don't invalidate
+    v.set((date(2022, 1, 1), date(2022, 1, 31)))
+    assert s.set("".join(["a"] * 100)) is False
+    n.set(int("1000"))
+    await flush()
+    assert o._exec_count == 1
+
+    # Equal values of a different type do invalidate
+    assert n.set(1000.0) is True
+    await flush()
+    assert o._exec_count == 2
+
+    v.set((date(2022, 1, 1), date(2022, 2, 1)))
+    await flush()
+    assert o._exec_count == 3
+
+    # ._set(), used for session inputs, only checks identity, so that resent values
+    # (e.g. with `priority: "event"`) still invalidate
+    assert s._set("".join(["a"] * 100)) is True
+    await flush()
+    assert o._exec_count == 4
+
+    # Values that compare equal but can be told apart do invalidate
+    utc = datetime(2022, 1, 1, 12, tzinfo=timezone.utc)
+    dt = Value(utc)
+    f = Value(0.0)
+
+    @Effect()
+    def o2():
+        dt()
+        f()
+
+    await flush()
+    assert dt.set(datetime(2022, 1, 1, 12, tzinfo=timezone.utc)) is False
+    assert f.set(float("0")) is False
+    assert dt.set(utc.astimezone(timezone(timedelta(hours=5)))) is True
+    assert f.set(-0.0) is True
+    await flush()
+    assert o2._exec_count == 2
+
+
 # ======================================================================
 # Intializing reactive.Value to MISSING, and unsetting
 # ======================================================================
@@ -660,6 +717,37 @@ async def test_dependent_invalidation():
     assert error_occurred is False
 
 
+@pytest.mark.asyncio
+async def test_dependent_invalidation_error_keeps_other_dependents():
+    v = Value(1)
+
+    @Effect()
+    def a():
+        v()
+
+    @Effect()
+    def b():
+        v()
+
+    await flush()
+
+    def fail():
+        raise RuntimeError("on_invalidate failed")
+
+    a.on_invalidate(fail)
+
+    # a is invalidated first; its error stops b from being invalidated this time
+    with pytest.raises(RuntimeError, match="on_invalidate failed"):
+        v.set(2)
+    await flush()
+    assert b._exec_count == 1
+
+    # But b is still a dependent of v
+    v.set(3)
+    await flush()
+    assert b._exec_count == 2
+
+
 # ------------------------------------------------------------
 # req() pauses execution in @effect() and @calc()
 # ------------------------------------------------------------